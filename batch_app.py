@@ -0,0 +1,200 @@
+# batch_app.py
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from dotenv import load_dotenv
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from langchain_workflows.workflow_definitions import SQLRAGWorkflow
+
+# Load environment variables
+load_dotenv()
+
+
+def load_questions(input_path: str) -> List[Dict[str, str]]:
+    """
+    Reads questions from a JSONL file.
+
+    Every line is a JSON object with the question in "question", "body" or "title" and an optional
+    identifier in "id" or "request_id", e.g. {"request_id": "q-01", "title": "...", "body": "..."}.
+    Lines without an identifier are identified by their line number.
+
+    Args:
+        input_path (str): Path to the JSONL file.
+
+    Returns:
+        List[Dict[str, str]]: Questions as {"id": ..., "question": ...}.
+    """
+    questions = []
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            question = item.get("question") or item.get("body") or item.get("title")
+            if not question:
+                raise ValueError(f"Line {line_number} of {input_path} has no question.")
+            question_id = str(item.get("id") or item.get("request_id") or line_number)
+            questions.append({"id": question_id, "question": question})
+    return questions
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """
+    Returns the identifiers of questions already answered in the output file.
+
+    Questions that ended with an error are not included, so they are retried on resume.
+    A line cut short by a crash is ignored.
+
+    Args:
+        output_path (str): Path to the output JSONL file.
+
+    Returns:
+        Set[str]: Identifiers of answered questions.
+    """
+    answered = set()
+    if not os.path.exists(output_path):
+        return answered
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if not result.get("error"):
+                answered.add(result["id"])
+    return answered
+
+
+def remove_failed_results(output_path: str) -> None:
+    """
+    Removes the results of failed questions and lines cut short by a crash from the output file.
+
+    Failed questions are answered again on resume, so this keeps a single result per question.
+    The file is rewritten next to the original and swapped in, a crash meanwhile leaves it intact.
+
+    Args:
+        output_path (str): Path to the output JSONL file.
+    """
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, encoding="utf-8") as f:
+        lines = f.readlines()
+
+    kept = []
+    for line in lines:
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if not result.get("error"):
+            kept.append(line if line.endswith("\n") else line + "\n")
+    if kept == lines:
+        return
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(kept)
+    os.replace(tmp_path, output_path)
+    if len(kept) < len(lines):
+        print(f"Removed {len(lines) - len(kept)} failed or incomplete results from {output_path}.")
+
+
+def answer_question(workflow: SQLRAGWorkflow, question: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Runs one question through the workflow and collects the answer, the SQL used, charts and prompt sizes.
+
+    Args:
+        workflow (SQLRAGWorkflow): The shared workflow.
+        question (Dict[str, str]): Question as {"id": ..., "question": ...}.
+
+    Returns:
+        Dict[str, Any]: The result line for the output file.
+    """
+    result = {
+        "id": question["id"],
+        "question": question["question"],
+        "answer": None,
+        "sql": [],
+        "charts": [],
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "elapsed_seconds": None,
+        "error": None,
+    }
+    # The counter sums per thread, so these totals belong to this question only
+    workflow.prompt_token_counter.reset_totals()
+    start = time.perf_counter()
+    try:
+        for stage in workflow.run_agent(question["question"], []):
+            for step in stage.get("steps", []):
+                if step.action.tool == "SQL Executor":
+                    result["sql"].append(step.action.tool_input)
+                elif step.action.tool == "Data Visualizer":
+                    try:
+                        result["charts"].append(json.loads(step.observation).get("chart"))
+                    except (ValueError, AttributeError):
+                        pass
+            if stage.get("output"):
+                result["answer"] = stage["output"]
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    result.update(workflow.prompt_token_counter.get_totals())
+    return result
+
+
+def run_batch(input_path: str, output_path: str, workers: int, requests_per_second: float):
+    """
+    Answers all questions of the input file that are not answered in the output file yet.
+
+    Results are appended to the output file as soon as each question finishes, so the output
+    file is also the checkpoint to resume from after a crash. Results of failed questions are
+    removed before they are retried, so every question has at most one result in the file.
+
+    Args:
+        input_path (str): Path to the questions JSONL file.
+        output_path (str): Path to the answers JSONL file.
+        workers (int): Number of questions answered concurrently.
+        requests_per_second (float): Maximum rate of calls to the LLM endpoint across all workers.
+    """
+    questions = load_questions(input_path)
+    answered = load_checkpoint(output_path)
+    pending = [question for question in questions if question["id"] not in answered]
+    print(f"{len(questions)} questions, {len(answered)} already answered, {len(pending)} to go.")
+    if not pending:
+        return
+    remove_failed_results(output_path)
+
+    rate_limiter = InMemoryRateLimiter(requests_per_second=requests_per_second, max_bucket_size=workers)
+    workflow = SQLRAGWorkflow(rate_limiter=rate_limiter)
+
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(answer_question, workflow, question) for question in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            # Only this thread writes, each finished answer is flushed right away
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            status = "error" if result["error"] else "ok"
+            print(f"[{done}/{len(pending)}] {result['id']}: {status} in {result['elapsed_seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answers questions from a JSONL file with the SQL RAG workflow.")
+    parser.add_argument("input", help="JSONL file with questions.")
+    parser.add_argument("output", help="JSONL file for answers. Already answered questions are skipped.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of questions answered concurrently.")
+    parser.add_argument("--requests-per-second", type=float, default=1.0, help="Maximum rate of LLM calls.")
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, args.workers, args.requests_per_second)
+
+
+if __name__ == "__main__":
+    main()
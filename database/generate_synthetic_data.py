@@ -0,0 +1,291 @@
+# database/generate_synthetic_data.py
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+
+from setup_db import create_tables
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CROPS_CSV = os.path.join(DATABASE_DIR, 'crops_polish_realistic_agriculture.csv')
+WAGES_CSV = os.path.join(DATABASE_DIR, 'employee_records_jan2022_dec2024.csv')
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+YEARS = [2022, 2023, 2024]
+
+# Column order matches the shipped CSV files so the chunks can be loaded with setup_db.py
+CROPS_COLUMNS = ["id", "crop_name", "month", "yield_amount", "target", "year"]
+WAGES_COLUMNS = ["id", "employee_name", "wage", "month", "year", "time_worked"]
+
+FIRST_NAMES = [
+    "Anna", "Jan", "Krzysztof", "Daniel", "Dominik", "Marcin", "Sylwia", "Agnieszka",
+    "Andrzej", "Barbara", "Bartosz", "Beata", "Ewa", "Grzegorz", "Joanna", "Katarzyna",
+    "Łukasz", "Magdalena", "Małgorzata", "Michał", "Monika", "Paweł", "Piotr", "Tomasz",
+    "Wojciech", "Zofia", "Żaneta", "Jakub", "Kamil", "Karolina", "Marta", "Stanisław"
+]
+LAST_NAMES = [
+    "Antoniuk", "Jerzmanowski", "Kosiniak", "Jeleń", "Dąbrowski", "Marciniak", "Salamon",
+    "Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski",
+    "Zieliński", "Szymański", "Woźniak", "Kozłowski", "Jankowski", "Mazur", "Kwiatkowski",
+    "Krawczyk", "Piotrowski", "Grabowski", "Pawłowski", "Michalski", "Król", "Wieczorek",
+    "Jabłoński", "Wróbel", "Majewski", "Olszewski", "Stępień", "Malinowski", "Górski", "Sikora"
+]
+MIDDLE_INITIALS = "ABCDEFGHIJKLMNOPRSTWZ"
+
+
+def load_crop_profiles(csv_path: str = CROPS_CSV) -> Dict[str, dict]:
+    """
+    Derives per-crop season months and yield/target ranges from the shipped crops CSV.
+
+    Args:
+        csv_path (str): Path to the crops CSV file.
+
+    Returns:
+        Dict[str, dict]: Crop name mapped to its months and value ranges.
+    """
+    profiles = {}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            profile = profiles.setdefault(row['crop_name'], {
+                'months': set(),
+                'yield_range': [float('inf'), float('-inf')],
+                'target_range': [float('inf'), float('-inf')],
+            })
+            profile['months'].add(row['month'])
+            for key, column in (('yield_range', 'yield_amount'), ('target_range', 'target')):
+                value = float(row[column])
+                profile[key][0] = min(profile[key][0], value)
+                profile[key][1] = max(profile[key][1], value)
+
+    for profile in profiles.values():
+        profile['months'] = sorted(profile['months'], key=MONTHS.index)
+    return profiles
+
+
+def load_wage_profile(csv_path: str = WAGES_CSV) -> dict:
+    """
+    Derives employee names and wage/time ranges from the shipped wages CSV.
+
+    Args:
+        csv_path (str): Path to the wages CSV file.
+
+    Returns:
+        dict: Seed employee names and value ranges.
+    """
+    names = []
+    wages = []
+    times = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['employee_name'] not in names:
+                names.append(row['employee_name'])
+            wages.append(float(row['wage']))
+            times.append(float(row['time_worked']))
+    return {
+        'names': names,
+        'wage_range': (min(wages), max(wages)),
+        'time_range': (min(times), max(times)),
+    }
+
+
+@lru_cache(maxsize=None)
+def _name_pool(seed_names: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    """Returns all (first, last) name combinations that are not seed names, in a mixed order."""
+    pool = []
+    for combination in range(len(FIRST_NAMES) * len(LAST_NAMES)):
+        first_index = combination % len(FIRST_NAMES)
+        # Shifting the last name by the first name index visits every pair exactly once
+        last_index = (combination // len(FIRST_NAMES) + first_index) % len(LAST_NAMES)
+        first = FIRST_NAMES[first_index]
+        last = LAST_NAMES[last_index]
+        if first.endswith("a") and last.endswith(("ski", "cki", "dzki")):
+            last = last[:-1] + "a"
+        if f"{first} {last}" not in seed_names:
+            pool.append((first, last))
+    return pool
+
+
+def employee_name(index: int, seed_names: List[str]) -> str:
+    """
+    Returns a unique, deterministic Polish employee name for the given employee index.
+
+    The first names are the ones from the shipped data. Later names combine first and last
+    name pools, using the feminine surname form where Polish grammar requires it. Once all
+    combinations are used, a middle initial and then a number keep the names unique.
+
+    Args:
+        index (int): Zero-based employee index.
+        seed_names (List[str]): Employee names from the shipped CSV.
+
+    Returns:
+        str: Employee name, e.g. "Anna Antoniuk" or "Ewa K. Nowak".
+    """
+    if index < len(seed_names):
+        return seed_names[index]
+    pool = _name_pool(tuple(seed_names))
+    round_number, combination = divmod(index - len(seed_names), len(pool))
+    first, last = pool[combination]
+    if round_number == 0:
+        return f"{first} {last}"
+    initial = MIDDLE_INITIALS[(round_number - 1) % len(MIDDLE_INITIALS)]
+    suffix = (round_number - 1) // len(MIDDLE_INITIALS)
+    return f"{first} {initial}. {last}" + (f" {suffix + 1}" if suffix else "")
+
+
+def generate_crops(rows: int, rng: random.Random, start_id: int = 1) -> Iterator[Tuple]:
+    """
+    Lazily generates Crops rows following the seasonal patterns of the shipped data.
+
+    Args:
+        rows (int): Number of rows to generate.
+        rng (random.Random): Random number generator.
+        start_id (int): Id of the first generated row.
+
+    Yields:
+        Tuple: (id, crop_name, month, yield_amount, target, year)
+    """
+    profiles = load_crop_profiles()
+    crop_names = sorted(profiles)
+    for row_id in range(start_id, start_id + rows):
+        crop_name = rng.choice(crop_names)
+        profile = profiles[crop_name]
+        yield_amount = round(rng.uniform(*profile['yield_range']), 2)
+        target = round(rng.uniform(*profile['target_range']), 2)
+        yield (row_id, crop_name, rng.choice(profile['months']), yield_amount, target, rng.choice(YEARS))
+
+
+def generate_wages(rows: int, rng: random.Random, start_id: int = 1) -> Iterator[Tuple]:
+    """
+    Lazily generates Wages rows, one record per employee per month of 2022 - 2024.
+
+    Rows are ordered like the shipped CSV: all employees for January 2022, then February 2022, etc.
+    Every employee is present in every month, rows that do not divide evenly add one more employee
+    in the first months. With fewer rows than months, only the first months get a record.
+
+    Args:
+        rows (int): Number of rows to generate.
+        rng (random.Random): Random number generator.
+        start_id (int): Id of the first generated row.
+
+    Yields:
+        Tuple: (id, employee_name, wage, month, year, time_worked)
+    """
+    profile = load_wage_profile()
+    periods = [(year, month) for year in YEARS for month in MONTHS]
+    employees, remainder = divmod(rows, len(periods))
+    row_id = start_id
+    for period, (year, month) in enumerate(periods):
+        for index in range(employees + (1 if period < remainder else 0)):
+            wage = round(rng.uniform(*profile['wage_range']), 2)
+            time_worked = round(rng.uniform(*profile['time_range']), 1)
+            yield (row_id, employee_name(index, profile['names']), wage, month, year, time_worked)
+            row_id += 1
+
+
+def _chunks(rows: Iterator[Tuple], chunk_size: int) -> Iterator[List[Tuple]]:
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_to_db(db_path: str, crops: Iterator[Tuple], wages: Iterator[Tuple], chunk_size: int, reset: bool = False):
+    """
+    Streams generated rows into the Crops and Wages tables of an SQLite database.
+
+    Args:
+        db_path (str): Path to the SQLite database. Tables are created if missing. Crash-unsafe bulk load
+            settings are used only for a new database or with reset.
+        crops (Iterator[Tuple]): Generated Crops rows.
+        wages (Iterator[Tuple]): Generated Wages rows.
+        chunk_size (int): Number of rows inserted per transaction.
+        reset (bool): Whether to delete existing rows before inserting.
+    """
+    is_new = not os.path.exists(db_path)
+    create_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    if is_new or reset:
+        # Bulk load settings, a crash can corrupt the file, which only holds data that can be generated again.
+        # Existing databases keep the safe defaults, they may hold real data the rows are appended to.
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+    cursor = conn.cursor()
+
+    if reset:
+        cursor.execute("DELETE FROM Crops")
+        cursor.execute("DELETE FROM Wages")
+        conn.commit()
+
+    # Ids are left to AUTOINCREMENT so generated data can be appended to existing tables
+    for chunk in _chunks(crops, chunk_size):
+        cursor.executemany('''
+            INSERT INTO Crops (crop_name, month, yield_amount, target, year)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (row[1:] for row in chunk))
+        conn.commit()
+
+    for chunk in _chunks(wages, chunk_size):
+        cursor.executemany('''
+            INSERT INTO Wages (employee_name, wage, month, year, time_worked)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (row[1:] for row in chunk))
+        conn.commit()
+
+    conn.close()
+
+
+def write_to_csv(output_dir: str, crops: Iterator[Tuple], wages: Iterator[Tuple], chunk_size: int):
+    """
+    Streams generated rows into chunked CSV files with the same layout as the shipped CSVs.
+
+    Args:
+        output_dir (str): Directory for the CSV files, e.g. crops_00001.csv, wages_00001.csv.
+        crops (Iterator[Tuple]): Generated Crops rows.
+        wages (Iterator[Tuple]): Generated Wages rows.
+        chunk_size (int): Maximum number of rows per CSV file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for prefix, columns, rows in (("crops", CROPS_COLUMNS, crops), ("wages", WAGES_COLUMNS, wages)):
+        for number, chunk in enumerate(_chunks(rows, chunk_size), start=1):
+            path = os.path.join(output_dir, f"{prefix}_{number:05d}.csv")
+            with open(path, "w", newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates synthetic Crops and Wages data for scale and load testing.")
+    parser.add_argument("--crops", type=int, default=10_000, help="Number of Crops rows to generate.")
+    parser.add_argument("--wages", type=int, default=10_000, help="Number of Wages rows to generate.")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--db", help="Path to the SQLite database to write to.")
+    output.add_argument("--csv-dir", help="Directory to write chunked CSV files to.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per transaction or per CSV file.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, the same seed gives the same data.")
+    parser.add_argument("--reset", action="store_true", help="Delete existing rows before writing to the database.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    crops = generate_crops(args.crops, rng)
+    wages = generate_wages(args.wages, rng)
+
+    if args.db:
+        write_to_db(args.db, crops, wages, args.chunk_size, reset=args.reset)
+        print(f"Generated {args.crops} Crops and {args.wages} Wages rows in {args.db}.")
+    else:
+        write_to_csv(args.csv_dir, crops, wages, args.chunk_size)
+        print(f"Generated {args.crops} Crops and {args.wages} Wages rows in {args.csv_dir}.")
+
+
+if __name__ == "__main__":
+    main()
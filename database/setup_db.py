@@ -4,11 +4,14 @@
 import sqlite3
 import pandas as pd
 
-def create_tables():
+def create_tables(db_path: str = 'farm_management.db'):
     """
     Creates the Crops and Wages tables in the SQLite database.
+
+    Args:
+        db_path (str): Path to the SQLite database.
     """
-    conn = sqlite3.connect('farm_management.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Create Crops table with year column
@@ -1,30 +1,68 @@
-def _parse_to_markdown_table(data: str):
+import ast
+from typing import Optional
+
+import pandas as pd
+
+# Larger results are paginated, Markdown tables with thousands of rows freeze the browser
+MARKDOWN_MAX_ROWS = 50
+
+
+def render_markdown_table(df: pd.DataFrame, max_rows: int = MARKDOWN_MAX_ROWS, page: int = 0, total_rows: Optional[int] = None) -> str:
+    """
+    Renders one page of a DataFrame as a Markdown table with the DataFrame's column names.
+
+    Only the rows of the requested page are converted to text, so the cost does not grow with the result size.
+
+    Args:
+        df (pd.DataFrame): The data to render.
+        max_rows (int): Number of rows per page.
+        page (int): Zero-based page number.
+        total_rows (int): Number of rows of the full result, if df holds only a part of it.
+
+    Returns:
+        str: Markdown table, followed by a row range note when the result does not fit on one page.
+    """
+    total_rows = len(df) if total_rows is None else total_rows
+    start = page * max_rows
+    page_df = df.iloc[start:start + max_rows]
+    # Columns are taken by position, a join can return the same column name twice. NULLs render as empty cells.
+    columns = []
+    for i in range(page_df.shape[1]):
+        column = page_df.iloc[:, i].astype(object)
+        column = column.where(column.notna(), "").astype(str)
+        columns.append(column.str.replace("|", "\\|", regex=False).str.replace("\n", " ", regex=False))
+
+    header = "| " + " | ".join(str(column) for column in df.columns) + " |"
+    separator = "|" + "---|" * len(df.columns)
+    rows = ["| " + " | ".join(row) + " |" for row in zip(*columns)]
+
+    table = "\n".join([header, separator] + rows)
+    if total_rows > len(rows):
+        table += f"\n\n_Rows {start + 1} - {start + len(rows)} of {total_rows}_"
+    return table
+
+
+def _parse_to_markdown_table(data: str, max_rows: int = MARKDOWN_MAX_ROWS):
     try:
-        data = eval(data)
-        if not data:
-            return "Empty data"
-
-        columns = len(max(data, key=len))
-
-        header = "| " + " | ".join(f"Column {i+1}" for i in range(columns)) + " |"
-        separator = "|" + "|".join("---" for _ in range(columns)) + "|"
-
-        rows = []
-        for item in data:
-            row = []
-            for i in range(columns):
-                if i < len(item):
-                    if isinstance(item[i], (list, tuple)):
-                        row.append(", ".join(map(str, item[i])))
-                    else:
-                        row.append(str(item[i]))
-                else:
-                    row.append("")
-            rows.append("| " + " | ".join(row) + " |")
-
-        return "\n".join([header, separator] + rows)
-    except:
+        data = ast.literal_eval(data)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
         return data
+    if not data:
+        return "Empty data"
+    if not isinstance(data, (list, tuple)):
+        return str(data)
+
+    # Only the displayed rows are converted, the column count comes from those rows
+    rows = [
+        [", ".join(map(str, value)) if isinstance(value, (list, tuple)) else value for value in item]
+        if isinstance(item, (list, tuple)) else [item]
+        for item in data[:max_rows]
+    ]
+    # Short rows are padded here, with object columns so integers are not turned into floats like 3.0
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    df = pd.DataFrame(rows, columns=[f"Column {i + 1}" for i in range(width)], dtype=object)
+    return render_markdown_table(df, max_rows=max_rows, total_rows=len(data))
 
 def trim_agent_response(text: str) -> str:
     index = text.find("Action: ")
@@ -34,9 +72,9 @@ def trim_agent_response(text: str) -> str:
 
 def parse_tool_observetion(tool_name: str, observation: str) -> str:
     match tool_name:
-        case "generate_sql_query":
+        case "generate_sql_query" | "SQL Query Generator":
             return observation
-        case "execute_sql_query":
+        case "execute_sql_query" | "SQL Executor":
             return _parse_to_markdown_table(observation)
         case "_Exception":
             return "I couldn't find any tool I could use to respond to your request"
@@ -0,0 +1,173 @@
+# langchain_workflows/llm_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from . import prompts
+
+CACHE_MODES = ("readwrite", "record", "replay")
+
+
+class LLMCacheMiss(Exception):
+    """
+    Raised in replay mode when a call to the LLM was not recorded.
+    """
+
+
+def get_prompts_version() -> str:
+    """
+    Returns a hash of the prompt definitions, used to drop cached responses when prompts change.
+
+    Returns:
+        str: Short hexadecimal hash of prompts.py.
+    """
+    with open(prompts.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    A persistent exact-match cache of LLM responses stored in a local SQLite file.
+
+    Entries are keyed by the model configuration (deployment, temperature, ...) and the exact
+    message list. Entries older than `max_age_seconds` are dropped, and the least recently used
+    entries are evicted once the stored responses exceed `max_size_bytes`. All entries are dropped
+    when prompts.py changes.
+
+    Modes:
+        readwrite: answer from the cache when possible, store new responses.
+        record: always call the LLM and store (overwrite) the responses.
+        replay: answer only from the cache, raise LLMCacheMiss otherwise. No network calls are made.
+    """
+
+    def __init__(
+        self,
+        path: str = "llm_cache.db",
+        mode: str = "readwrite",
+        max_size_bytes: int = 100 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ):
+        """
+        Opens (or creates) the cache file.
+
+        Args:
+            path (str): Path to the SQLite cache file.
+            mode (str): One of readwrite, record, replay.
+            max_size_bytes (int): Maximum total size of the stored responses.
+            max_age_seconds (float): Maximum age of an entry. Ignored in replay mode.
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode}, expected one of {', '.join(CACHE_MODES)}.")
+        self.path = path
+        self.mode = mode
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by all threads of the batch runner, guarded by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                llm_string TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        prompts_version = get_prompts_version()
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'prompts_version'").fetchone()
+        if row is None or row[0] != prompts_version:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('prompts_version', ?)", (prompts_version,))
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Returns the cached response for the prompt and model configuration, if any.
+
+        Args:
+            prompt (str): Serialized message list.
+            llm_string (str): Serialized model configuration.
+
+        Returns:
+            Optional[RETURN_VAL_TYPE]: The cached generations or None.
+        """
+        if self.mode == "record":
+            return None
+
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.mode != "replay" and now - row[1] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+
+        if row is None:
+            if self.mode == "replay":
+                raise LLMCacheMiss("The LLM call was not recorded, run in record or readwrite mode first.")
+            return None
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Stores a response and evicts expired and least recently used entries.
+
+        Args:
+            prompt (str): Serialized message list.
+            llm_string (str): Serialized model configuration.
+            return_val (RETURN_VAL_TYPE): The generations returned by the LLM.
+        """
+        if self.mode == "replay":
+            return
+
+        response = dumps(return_val)
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO llm_cache (key, llm_string, prompt, response, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (self._key(prompt, llm_string), llm_string, prompt, response, len(response) + len(prompt), now, now))
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age_seconds,))
+            # Keep the most recently used entries that fit into the size limit
+            self._conn.execute('''
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, created_at DESC) AS total FROM llm_cache
+                    ) WHERE total > ?
+                )
+            ''', (self.max_size_bytes,))
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        """
+        Removes all cached responses.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
@@ -0,0 +1,235 @@
+# langchain_workflows/prompt_assembly.py
+
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain.tools.render import render_text_description
+from langchain_core.agents import AgentAction
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.outputs import LLMResult
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.runnables import Runnable, RunnablePassthrough
+from langchain_core.tools import BaseTool
+
+# Limits for the variable part of the ReAct prompt. Every observation is shortened with the same
+# limits, so a step is rendered the same way in the iteration that adds it and in all later ones.
+OBSERVATION_MAX_LINES = 60
+OBSERVATION_MAX_CHARS = 4000
+SCRATCHPAD_MAX_CHARS = 12000
+SUMMARY_MAX_CHARS = 200
+HISTORY_MAX_MESSAGES = 10
+HISTORY_MESSAGE_MAX_CHARS = 1000
+
+
+def compact_observation(observation: Any, max_lines: int = OBSERVATION_MAX_LINES, max_chars: int = OBSERVATION_MAX_CHARS) -> str:
+    """
+    Shortens a tool observation for the agent scratchpad, e.g. keeps the header and first rows of a table.
+
+    The result depends only on the observation and the limits.
+
+    Args:
+        observation (Any): The tool output.
+        max_lines (int): Maximum number of lines kept.
+        max_chars (int): Maximum number of characters kept.
+
+    Returns:
+        str: The observation, with a note about the omitted part if it was shortened.
+    """
+    text = str(observation)
+    lines = text.splitlines()
+    if len(lines) > max_lines:
+        text = "\n".join(lines[:max_lines]) + f"\n... ({len(lines) - max_lines} more lines omitted)"
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"... ({len(text) - max_chars} more characters omitted)"
+    return text
+
+
+def _summarize_observation(observation: Any) -> str:
+    lines = str(observation).splitlines() or [""]
+    summary = lines[0][:SUMMARY_MAX_CHARS]
+    if len(lines) > 1 or len(lines[0]) > SUMMARY_MAX_CHARS:
+        summary += f" ... (shortened, {len(lines)} lines in total)"
+    return summary
+
+
+def format_compact_scratchpad(intermediate_steps: Sequence[Tuple[AgentAction, Any]], max_chars: int = SCRATCHPAD_MAX_CHARS) -> str:
+    """
+    Builds the agent scratchpad like LangChain's format_log_to_str, with compacted observations.
+
+    All observations are shortened with the default limits of compact_observation, so within one
+    question the scratchpad of an iteration starts with the scratchpad of the previous one. If it is
+    longer than max_chars, the observations of the oldest steps are reduced to their first line and
+    the latest step is always kept. The scratchpad only grows, so a step that was reduced stays
+    reduced in later iterations; the iteration that reduces it is the only one that changes the
+    text of earlier steps.
+
+    Args:
+        intermediate_steps (Sequence[Tuple[AgentAction, Any]]): Actions taken so far with their observations.
+        max_chars (int): Size budget of the scratchpad.
+
+    Returns:
+        str: The scratchpad.
+    """
+    observations = [compact_observation(observation) for _, observation in intermediate_steps]
+
+    def render() -> List[str]:
+        return [
+            f"{action.log}\nObservation: {observation}\nThought: "
+            for (action, _), observation in zip(intermediate_steps, observations)
+        ]
+
+    parts = render()
+    for i in range(len(intermediate_steps) - 1):
+        if sum(len(part) for part in parts) <= max_chars:
+            break
+        observations[i] = _summarize_observation(intermediate_steps[i][1])
+        parts = render()
+    return "".join(parts)
+
+
+def format_chat_history(
+    messages: Sequence[Dict[str, str]],
+    max_messages: int = HISTORY_MAX_MESSAGES,
+    max_message_chars: int = HISTORY_MESSAGE_MAX_CHARS,
+) -> str:
+    """
+    Renders the conversation history compactly, one line per message, most recent messages only.
+
+    Args:
+        messages (Sequence[Dict[str, str]]): Messages as {"role": "user" | "assistant", "content": str}.
+        max_messages (int): Number of most recent messages kept.
+        max_message_chars (int): Maximum length of a single message.
+
+    Returns:
+        str: The history, or "(none)" for a new conversation.
+    """
+    lines = []
+    for message in list(messages)[-max_messages:]:
+        role = "User" if message["role"] == "user" else "Assistant"
+        content = " ".join(str(message["content"]).split())
+        if len(content) > max_message_chars:
+            content = content[:max_message_chars] + " ..."
+        lines.append(f"{role}: {content}")
+    return "\n".join(lines) if lines else "(none)"
+
+
+def create_compact_react_agent(llm: BaseLanguageModel, tools: Sequence[BaseTool], prompt: BasePromptTemplate) -> Runnable:
+    """
+    Creates a ReAct agent like LangChain's create_react_agent, with a compacted scratchpad.
+
+    Tool descriptions and names are rendered once into the prompt, before the chat history,
+    question and scratchpad. The instructions and tools alone are shorter than the minimum prefix
+    that provider prompt caching works with (1024 tokens for Azure OpenAI), the reuse comes from
+    the iterations of one question: each of them repeats the prompt of the previous one and
+    appends a step.
+
+    Args:
+        llm (BaseLanguageModel): The language model.
+        tools (Sequence[BaseTool]): The tools available to the agent.
+        prompt (BasePromptTemplate): Prompt with tools, tool_names and agent_scratchpad variables.
+
+    Returns:
+        Runnable: The agent.
+    """
+    missing_vars = {"tools", "tool_names", "agent_scratchpad"}.difference(
+        prompt.input_variables + list(prompt.partial_variables)
+    )
+    if missing_vars:
+        raise ValueError(f"Prompt missing required variables: {missing_vars}")
+
+    prompt = prompt.partial(
+        tools=render_text_description(list(tools)),
+        tool_names=", ".join(tool.name for tool in tools),
+    )
+    return (
+        RunnablePassthrough.assign(agent_scratchpad=lambda x: format_compact_scratchpad(x["intermediate_steps"]))
+        | prompt
+        | llm.bind(stop=["\nObservation"])
+        | ReActSingleInputOutputParser()
+    )
+
+
+def _prompt_usage(response: LLMResult) -> Tuple[Optional[int], Optional[int]]:
+    """Returns (prompt tokens, cached prompt tokens) reported by the provider, if any."""
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage.get("prompt_tokens") is not None:
+        cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        return token_usage["prompt_tokens"], cached
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), (usage.get("input_token_details") or {}).get("cache_read")
+    return None, None
+
+
+class PromptTokenCounter(BaseCallbackHandler):
+    """
+    Callback handler reporting the prompt size of every LLM call.
+
+    Each call is printed and kept in `calls`. Totals are also summed per thread between
+    reset_totals() and get_totals(), so concurrent batch workers can report their own questions.
+    Calls answered from the LLM cache are counted in cached_llm_calls only, they send no tokens.
+    """
+
+    def __init__(self, max_calls: int = 1000, detect_cache_hits: bool = True):
+        """
+        Args:
+            max_calls (int): Number of most recent calls kept in `calls`.
+            detect_cache_hits (bool): Treat results without llm_output as cache hits. Only valid when
+                streaming is disabled, streamed results have no llm_output either.
+        """
+        self.calls = deque(maxlen=max_calls)
+        self.detect_cache_hits = detect_cache_hits
+        self._local = threading.local()
+
+    def reset_totals(self) -> None:
+        """
+        Starts summing the calls made by the current thread from zero.
+        """
+        self._local.totals = {
+            "llm_calls": 0, "cached_llm_calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "prompt_chars": 0,
+        }
+
+    def get_totals(self) -> Dict[str, int]:
+        """
+        Returns the sums over the calls made by the current thread since reset_totals().
+
+        Returns:
+            Dict[str, int]: llm_calls, cached_llm_calls, prompt_tokens, cached_prompt_tokens and prompt_chars.
+                Only llm_calls contribute to the token and character sums.
+        """
+        if not hasattr(self._local, "totals"):
+            self.reset_totals()
+        return dict(self._local.totals)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self._local.prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        if not hasattr(self._local, "totals"):
+            self.reset_totals()
+        prompt_chars = getattr(self._local, "prompt_chars", None)
+
+        # A response from the LLM cache carries the usage of the call that was cached, not of this one
+        if self.detect_cache_hits and response.llm_output is None:
+            self.calls.append({"cache_hit": True, "prompt_chars": prompt_chars})
+            self._local.totals["cached_llm_calls"] += 1
+            print(f"LLM call: answered from the cache, {prompt_chars} prompt characters")
+            return
+
+        prompt_tokens, cached_prompt_tokens = _prompt_usage(response)
+        call = {
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_prompt_tokens,
+            "prompt_chars": prompt_chars,
+        }
+        self.calls.append(call)
+
+        self._local.totals["llm_calls"] += 1
+        for name, value in call.items():
+            self._local.totals[name] += value or 0
+        print(f"LLM call: {prompt_tokens} prompt tokens ({cached_prompt_tokens or 0} cached), {call['prompt_chars']} prompt characters")
@@ -39,10 +39,15 @@ Observation: the result of the action
 Thought: I now know the final answer
 Final Answer: the final answer to the original input question
 
+### Tools
+{tools}
+
 ### Context
 - Use context from the previous conversation to answer follow-up questions.
-- Tools available to you: {tools}
-- Previous conversation history: {chat_history}
+- Long tool outputs are shortened in your notes below and only the first rows of a query result are shown. Aggregate, filter or use ORDER BY with LIMIT in SQL instead of listing many rows, and put every value the answer needs in the Final Answer.
+
+Previous conversation history:
+{chat_history}
 
 Begin!
 
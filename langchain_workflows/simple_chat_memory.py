@@ -3,6 +3,7 @@
 from typing import Any, Dict, List 
 from langchain.memory.chat_memory import BaseChatMemory
 from enum import Enum
+from .prompt_assembly import format_chat_history
 
 class Role(Enum):
     USER = 'user'
@@ -24,7 +25,8 @@ class SimpleChatMemory(BaseChatMemory):
         return ["chat_history"]
 
     def load_memory_variables(self, _: Dict[str, Any]) -> Dict[str, Any]:
-        return {"chat_history": self.chat_memory}
+        # Rendered compactly, the history is re-sent with every ReAct iteration
+        return {"chat_history": format_chat_history(self.chat_memory)}
 
     def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
         self.add_message(inputs.get("input", ""), is_human=True)
@@ -3,38 +3,87 @@
 import os
 import sqlite3
 import tempfile
-from typing import Any, List
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
 
-from langchain.agents import Tool, AgentExecutor, create_react_agent
+from langchain.agents import Tool, AgentExecutor
 from langchain.schema import HumanMessage
+from langchain_core.rate_limiters import BaseRateLimiter
 from langchain_openai import AzureChatOpenAI
 from sqlalchemy import create_engine, text
 import pandas as pd
 
 from tools.visualization_tool import draw_bar_chart
 from tools.weather_tool import get_weather
+from tools.columnar_snapshot import ColumnarSnapshot
+from tools.schema_profile import SchemaProfile
+from tools.entity_resolver import EntityResolver
 from .simple_chat_memory import SimpleChatMemory, Message
 from .prompts import react_agent_prompt_template
+from .llm_cache import SQLiteLLMCache
+from .prompt_assembly import PromptTokenCounter, create_compact_react_agent
+
+# Number of recent query results kept for the UI
+QUERY_RESULTS_LIMIT = 20
+# Rows of a query result returned to the agent as text, the UI renders the full result
+QUERY_RESULT_PREVIEW_ROWS = 50
 
 class SQLRAGWorkflow:
-    def __init__(self, db_path: str = 'database/farm_management.db'):
+    def __init__(
+        self,
+        db_path: str = 'database/farm_management.db',
+        use_columnar_snapshot: Optional[bool] = None,
+        rate_limiter: Optional[BaseRateLimiter] = None,
+    ):
         """
         Initializes the SQL RAG Workflow with Azure OpenAI and database connection.
 
         Args:
             db_path (str): Path to the SQLite database.
+            use_columnar_snapshot (bool): Whether simple aggregate queries are answered from the columnar snapshot.
+                Defaults to the USE_COLUMNAR_SNAPSHOT environment variable.
+            rate_limiter (BaseRateLimiter): Optional limiter shared by all calls to the LLM endpoint.
         """
 
+        # With temperature=0 identical calls give identical answers, so responses are cached on disk.
+        # LLM_CACHE_MODE is one of readwrite (default), record, replay or off.
+        llm_cache_mode = os.getenv("LLM_CACHE_MODE", "readwrite").lower()
+        self.llm_cache = None
+        if llm_cache_mode != "off":
+            self.llm_cache = SQLiteLLMCache(os.getenv("LLM_CACHE_PATH", "llm_cache.db"), mode=llm_cache_mode)
+
+        # Reports the prompt size of every LLM call. Cache hits are recognized only with streaming disabled.
+        self.prompt_token_counter = PromptTokenCounter(detect_cache_hits=self.llm_cache is not None)
+
         self.llm = AzureChatOpenAI(
             azure_endpoint=os.getenv("AZURE_OPENAI_API_BASE"),
             openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
             openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-            temperature=0
+            temperature=0,
+            rate_limiter=rate_limiter,
+            cache=self.llm_cache,
+            # Token streaming bypasses the cache, the agent steps are still streamed
+            disable_streaming=self.llm_cache is not None,
+            callbacks=[self.prompt_token_counter]
         )
 
         self.db_path = db_path
         self.engine = create_engine(f'sqlite:///{self.db_path}')
+
+        if use_columnar_snapshot is None:
+            use_columnar_snapshot = os.getenv("USE_COLUMNAR_SNAPSHOT", "false").lower() == "true"
+        self.columnar_snapshot = ColumnarSnapshot(self.db_path) if use_columnar_snapshot else None
+        self.schema_profile = SchemaProfile(self.db_path)
+        # The entity index is loaded on the first question, not on every construction of the workflow
+        self.entity_resolver = EntityResolver(self.db_path)
+
+        # Recent SELECT results by the SQL passed to the executor, so the UI can render real tables
+        self.query_results: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        # The batch runner calls the tools of one workflow from several threads
+        self._query_results_lock = threading.Lock()
+
         self.tools = self.initialize_tools()
 
     def initialize_tools(self) -> List[Tool]:
@@ -87,8 +136,8 @@ class SQLRAGWorkflow:
         # Initialize memory from messages
         memory = SimpleChatMemory.from_messages(messages)
 
-        # Initialize the agent with tools and custom prompt
-        agent = create_react_agent(
+        # Initialize the agent with tools and custom prompt, long observations are compacted in the scratchpad
+        agent = create_compact_react_agent(
             llm=self.llm,
             tools=self.tools,
             prompt=react_agent_prompt_template,
@@ -134,18 +183,32 @@ class SQLRAGWorkflow:
         Returns:
             str: Generated SQL query.
         """
+        # Map crops and employees mentioned by the user to the exact values in the database
+        entity_notes = ""
+        for mention, matches in self.entity_resolver.find_mentions(instruction).items():
+            if len(matches) == 1 and mention != matches[0].value:
+                entity_notes += f"- '{mention}' refers to {matches[0].column} = '{matches[0].value}'.\n"
+            elif len(matches) > 1:
+                candidates = " or ".join(f"{match.column} = '{match.value}'" for match in matches)
+                entity_notes += (
+                    f"- '{mention}' is ambiguous, it may refer to {candidates}. "
+                    f"Include all of them (e.g. with IN) unless the instruction says which one is meant.\n"
+                )
+
         # Create a prompt for generating the SQL query
         messages = [
             HumanMessage(content=(
                 f"You are an SQL assistant. Generate a valid SQLite query based on the user's instruction.\n\n"
-                f"Available tables and columns:\n"
-                f"- Crops: crop_name (TEXT), year (INTEGER), month (TEXT), yield_amount (REAL), target (REAL)\n"
-                f"- Wages: employee_name (TEXT), wage (REAL), year (INTEGER), month (TEXT), time_worked (REAL)\n\n"
+                f"Available tables and columns with their values:\n"
+                f"{self.schema_profile.to_prompt()}\n\n"
                 f"Key Notes:\n"
+                f"- Use text values exactly as listed above, including case and parentheses.\n"
                 f"- Always format 'month' as a capitalized string (e.g., 'July').\n"
                 f"- The year is an INTEGER.\n"
                 f"- Ensure SQLite compatibility. Do not use unsupported syntax.\n"
-                f"- Do not include semicolons or stray quotation marks.\n\n"
+                f"- Do not include semicolons or stray quotation marks.\n"
+                # Request-specific content goes last, so the part above stays a stable prompt prefix
+                f"{entity_notes}\n"
                 f"Instruction: {instruction}\n\nSQL Query:"
             ))
         ]
@@ -171,7 +234,21 @@ class SQLRAGWorkflow:
         try:
             # Sanitize query by removing any trailing or leading characters
             cleaned_query = sql_query.strip().strip(";").strip('"').strip("'")
-            
+
+            # Answer simple aggregates from the columnar snapshot, everything else goes to SQLite
+            if self.columnar_snapshot is not None:
+                try:
+                    df = self.columnar_snapshot.query_sql(cleaned_query)
+                except Exception as e:
+                    # E.g. a failed build or a snapshot removed by another process, SQLite still has the answer
+                    print(f"Columnar snapshot failed, falling back to SQLite: {e}")
+                    df = None
+                if df is not None:
+                    if df.empty:
+                        return "Query returned no results."
+                    self._store_query_result(sql_query, df)
+                    return self._format_query_result(df)
+
             # Execute query with SQLAlchemy
             with self.engine.connect() as connection:
                 result = connection.execute(text(cleaned_query))
@@ -182,10 +259,13 @@ class SQLRAGWorkflow:
                     if not rows:
                         return "Query returned no results."
                     df = pd.DataFrame(rows, columns=result.keys())
-                    return df.to_string()
+                    self._store_query_result(sql_query, df)
+                    return self._format_query_result(df)
                 
                 # Handle other queries
                 connection.commit()
+                # New or changed crops and employees have to be resolvable right away
+                self.entity_resolver.refresh()
                 return "Query executed successfully."
         except sqlite3.OperationalError as oe:
             return f"SQLite OperationalError: {str(oe)}"
@@ -194,6 +274,34 @@ class SQLRAGWorkflow:
 
 
 
+    @staticmethod
+    def _format_query_result(df: pd.DataFrame) -> str:
+        # Formatting is slow for large results, only the rows the agent gets to see are formatted
+        text = df.head(QUERY_RESULT_PREVIEW_ROWS).to_string()
+        if len(df) > QUERY_RESULT_PREVIEW_ROWS:
+            text += f"\n... ({len(df)} rows total, first {QUERY_RESULT_PREVIEW_ROWS} shown)"
+        return text
+
+    def _store_query_result(self, sql_query: str, df: pd.DataFrame) -> None:
+        with self._query_results_lock:
+            self.query_results[sql_query] = df
+            self.query_results.move_to_end(sql_query)
+            while len(self.query_results) > QUERY_RESULTS_LIMIT:
+                self.query_results.popitem(last=False)
+
+    def get_query_result(self, sql_query: str) -> Optional[pd.DataFrame]:
+        """
+        Returns the DataFrame of a recently executed SELECT query.
+
+        Args:
+            sql_query (str): The SQL query exactly as passed to the SQL Executor tool.
+
+        Returns:
+            pd.DataFrame or None: The query result, or None if it is not available anymore.
+        """
+        with self._query_results_lock:
+            return self.query_results.get(sql_query)
+
     def visualize_data(self, data: str) -> str:
         """
         Creates a bar chart from the provided data and saves it to a temporary file.
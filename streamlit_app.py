@@ -1,21 +1,30 @@
 # streamlit_app.py
 
 import json
-from typing import Any, List
+import math
+from typing import Any, List, Optional, Tuple
 import streamlit as st
 from agents.sql_rag_agent import SQLRAGAgent
 import uuid
 import pandas as pd
 from dotenv import load_dotenv
 from langchain_workflows.simple_chat_memory import Message, Role
-from langchain_workflows.formatting import parse_tool_observetion, trim_agent_response
+from langchain_workflows.formatting import parse_tool_observetion, trim_agent_response, render_markdown_table, MARKDOWN_MAX_ROWS
 from langchain.globals import set_verbose
 
 # Load environment variables
 load_dotenv()
 
-# Initialize the SQL RAG Agent
-agent = SQLRAGAgent()
+# Rows per page of the dataframe widget used for large query results
+DATAFRAME_PAGE_SIZE = 1000
+
+# Initialize the SQL RAG Agent once per server process, not on every rerun of the script
+@st.cache_resource
+def get_agent() -> SQLRAGAgent:
+    return SQLRAGAgent()
+
+
+agent = get_agent()
 set_verbose(True)
 
 # Initialize session state for conversations and memory
@@ -83,7 +92,7 @@ def add_message(sender: str, ui_content: Any, llm_history_content: Any):
     })
 
 
-def parse_agent_response(response) -> (List[str], str):
+def parse_agent_response(response) -> Tuple[List[Tuple[str, Optional[pd.DataFrame]]], str, str]:
     """
     Parses the agent's response into individual steps and the final answer.
 
@@ -91,7 +100,8 @@ def parse_agent_response(response) -> (List[str], str):
         response (str): The raw response from the agent.
 
     Returns:
-        Tuple[List[str], str]: A list of step messages and the final answer.
+        Tuple[List[Tuple[str, Optional[pd.DataFrame]]], str, str]: A list of step messages with the query
+            result of SQL Executor steps, the final answer and the Markdown bar chart.
     """
     steps = []
     final_answer = ""
@@ -102,7 +112,12 @@ def parse_agent_response(response) -> (List[str], str):
             if stage.get("steps"):
                 tool_step = stage.get("steps")[0]
                 tool_name = tool_step.action.tool
-                steps.append(f" **{tool_name} Tool:** {parse_tool_observetion(tool_name, tool_step.observation)}")
+                # Query results are rendered from the DataFrame, with its real column names
+                query_result = agent.workflow.get_query_result(tool_step.action.tool_input) if tool_name == "SQL Executor" else None
+                if query_result is not None:
+                    steps.append((f" **{tool_name} Tool:** Query returned {len(query_result)} rows.", query_result))
+                else:
+                    steps.append((f" **{tool_name} Tool:** {parse_tool_observetion(tool_name, tool_step.observation)}", None))
                 # get the bar chart from data visualizer tool
                 if tool_name == "Data Visualizer":
                     print(tool_step.observation)
@@ -114,41 +129,89 @@ def parse_agent_response(response) -> (List[str], str):
                     except:
                         markdown_bar_chart = "Sadly, I couldn't generate bar chart :((("
             else:
-                steps.append(f" **Thinking...** {trim_agent_response(stage.get("messages")[0].content)}")
+                steps.append((f" **Thinking...** {trim_agent_response(stage.get("messages")[0].content)}", None))
         if stage.get("output"):
             final_answer =  stage.get('output')
     return steps, final_answer, markdown_bar_chart
 
 
+def display_table(df: pd.DataFrame, key: str):
+    """
+    Displays a query result in a dataframe widget, one page at a time for large results.
+
+    Args:
+        df (pd.DataFrame): The query result.
+        key (str): Unique key of the page selector.
+    """
+    if len(df) <= DATAFRAME_PAGE_SIZE:
+        st.dataframe(df)
+        return
+
+    pages = math.ceil(len(df) / DATAFRAME_PAGE_SIZE)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key)
+    start = (page - 1) * DATAFRAME_PAGE_SIZE
+    st.dataframe(df.iloc[start:start + DATAFRAME_PAGE_SIZE])
+    st.caption(f"Rows {start + 1} - {min(start + DATAFRAME_PAGE_SIZE, len(df))} of {len(df)}")
+
+
+def display_blocks(blocks: List[Any], key: str):
+    """
+    Displays an agent message made of Markdown blocks and query result tables.
+
+    Args:
+        blocks (List[Any]): Markdown strings and DataFrames.
+        key (str): Unique key of the message.
+    """
+    for idx, block in enumerate(blocks):
+        if isinstance(block, pd.DataFrame):
+            display_table(block, key=f"{key}-{idx}")
+        else:
+            st.markdown(block, unsafe_allow_html=True)
+
+
 def display_agent_response(agent_response: dict):
     """
     Displays the agent's response in the UI.
 
+    Small query results are shown as Markdown tables, large ones in a paginated dataframe widget.
+
     Args:
         agent_response (dict): The full response from the agent.
     """
     steps, final_answer, markdown_bar_chart = parse_agent_response(agent_response)
 
-    # Build the formatted message with Markdown
-    formatted_message = ""
+    # Build the message as Markdown blocks separated by large tables
+    blocks = []
+    markdown_parts = []
 
     # Add steps
-    for idx, step_text in enumerate(steps, start=1):
-        formatted_message += f"**{idx}.** {step_text.strip()}\n\n"
+    for idx, (step_text, query_result) in enumerate(steps, start=1):
+        markdown_parts.append(f"**{idx}.** {step_text.strip()}")
+        if query_result is None:
+            continue
+        if len(query_result) <= MARKDOWN_MAX_ROWS:
+            markdown_parts.append(render_markdown_table(query_result))
+        else:
+            blocks.append("\n\n".join(markdown_parts))
+            blocks.append(query_result)
+            markdown_parts = []
 
     # Add the final answer
     if final_answer:
-        formatted_message += f"**Final Answer:**\n\n{final_answer.strip()}"
+        markdown_parts.append(f"**Final Answer:**\n\n{final_answer.strip()}")
     if markdown_bar_chart:
-        formatted_message += f"\n**Requested chart:**\n\n{markdown_bar_chart}"
+        markdown_parts.append(f"**Requested chart:**\n\n{markdown_bar_chart}")
+    if markdown_parts:
+        blocks.append("\n\n".join(markdown_parts))
 
-    # Display the formatted message in Markdown
+    # Display the formatted message
+    conv_id = st.session_state.current_conversation
+    message_key = f"{conv_id}-{len(st.session_state.conversations[conv_id]['messages'])}"
     with st.chat_message("assistant"):
-        print(formatted_message)
-        st.markdown(formatted_message, unsafe_allow_html=True)
+        display_blocks(blocks, key=message_key)
 
     # Add the raw message to the conversation for history
-    add_message("Agent", formatted_message.strip(), final_answer.strip()) # to llm_history add only the final answer. Tool outputs are not needed here
+    add_message("Agent", blocks, final_answer.strip()) # to llm_history add only the final answer. Tool outputs are not needed here
 
 
 
@@ -165,9 +228,12 @@ def main():
     st.header(conv_name)
 
     # Display conversation messages using st.chat_message
-    for msg in st.session_state.conversations[conv_id]['messages']:
+    for msg_idx, msg in enumerate(st.session_state.conversations[conv_id]['messages']):
         with st.chat_message("user" if msg['sender'] == 'User' else "assistant"):
-            if isinstance(msg['content'], pd.DataFrame):
+            if isinstance(msg['content'], list):
+                # Agent responses with query result tables
+                display_blocks(msg['content'], key=f"{conv_id}-{msg_idx}")
+            elif isinstance(msg['content'], pd.DataFrame):
                 st.table(msg['content'])
             elif isinstance(msg['content'], dict):
                 # Display weather information
@@ -0,0 +1,164 @@
+# tests/test_columnar_snapshot.py
+
+import random
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from tools.columnar_snapshot import ColumnarSnapshot
+
+MONTHS = ["January", "February", "March", "April", "May", "June"]
+CROPS = ["Wheat", "Potato", "Tomato (Greenhouse)", "Rapeseed"]
+EMPLOYEES = ["Anna Nowak", "Daniel Jeleń", "Jan Jerzmanowski"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "farm.db")
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE Crops (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            crop_name TEXT NOT NULL,
+            month TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            yield_amount REAL NOT NULL,
+            target REAL NOT NULL
+        );
+        CREATE TABLE Wages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employee_name TEXT NOT NULL,
+            wage REAL NOT NULL,
+            month TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            time_worked REAL NOT NULL
+        );
+    ''')
+    conn.executemany(
+        "INSERT INTO Crops (crop_name, month, year, yield_amount, target) VALUES (?, ?, ?, ?, ?)",
+        [
+            (rng.choice(CROPS), rng.choice(MONTHS), rng.choice([2022, 2023, 2024]),
+             round(rng.uniform(1, 100), 2), round(rng.uniform(1, 100), 2))
+            for _ in range(500)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO Wages (employee_name, wage, month, year, time_worked) VALUES (?, ?, ?, ?, ?)",
+        [
+            (rng.choice(EMPLOYEES), round(rng.uniform(3000, 9000), 2), rng.choice(MONTHS),
+             rng.choice([2022, 2023, 2024]), round(rng.uniform(80, 180), 1))
+            for _ in range(300)
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def query_sqlite(db_path: str, sql_query: str) -> pd.DataFrame:
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql_query, conn)
+    finally:
+        conn.close()
+
+
+def assert_same_result(snapshot_result: pd.DataFrame, sqlite_result: pd.DataFrame):
+    assert snapshot_result is not None
+    assert list(snapshot_result.columns) == list(sqlite_result.columns)
+    assert len(snapshot_result) == len(sqlite_result)
+    for expected_row, actual_row in zip(sqlite_result.itertuples(index=False), snapshot_result.itertuples(index=False)):
+        for expected, actual in zip(expected_row, actual_row):
+            if expected is None or (isinstance(expected, float) and pd.isna(expected)):
+                assert actual is None
+            elif isinstance(expected, float):
+                assert actual == pytest.approx(expected)
+            else:
+                assert actual == expected
+
+
+@pytest.mark.parametrize("sql_query", [
+    "SELECT SUM(yield_amount) FROM Crops",
+    "SELECT crop_name, SUM(yield_amount) AS total_yield FROM Crops GROUP BY crop_name",
+    "SELECT crop_name, year, AVG(yield_amount), COUNT(*) FROM Crops WHERE month = 'March' GROUP BY crop_name, year",
+    "SELECT month, SUM(target) FROM Crops WHERE year IN (2022, 2024) AND crop_name = 'Potato' GROUP BY month",
+    "SELECT employee_name, AVG(wage) AS average_wage, SUM(time_worked) FROM Wages WHERE year = 2023 GROUP BY employee_name",
+    "SELECT year, COUNT(wage) FROM Wages WHERE employee_name IN ('Anna Nowak', 'Daniel Jeleń') GROUP BY year",
+])
+def test_query_sql_matches_sqlite(db_path, sql_query):
+    result = ColumnarSnapshot(db_path).query_sql(sql_query)
+    assert_same_result(result, query_sqlite(db_path, sql_query))
+
+
+@pytest.mark.parametrize("sql_query", [
+    "SELECT SUM(yield_amount), AVG(target), COUNT(*) FROM Crops WHERE crop_name = 'Banana'",
+    "SELECT SUM(wage), AVG(wage) FROM Wages WHERE year = 1999",
+    "SELECT crop_name, SUM(yield_amount) FROM Crops WHERE crop_name = 'Banana' GROUP BY crop_name",
+])
+def test_empty_selection_matches_sqlite_nulls(db_path, sql_query):
+    result = ColumnarSnapshot(db_path).query_sql(sql_query)
+    assert_same_result(result, query_sqlite(db_path, sql_query))
+
+
+def test_out_of_range_filter_values_do_not_overflow(db_path):
+    sql_query = (
+        "SELECT crop_name, SUM(yield_amount) FROM Crops "
+        "WHERE year IN (2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 100000) GROUP BY crop_name"
+    )
+    result = ColumnarSnapshot(db_path).query_sql(sql_query)
+    assert_same_result(result, query_sqlite(db_path, sql_query))
+
+    sql_query = "SELECT SUM(wage) FROM Wages WHERE year = 100000"
+    result = ColumnarSnapshot(db_path).query_sql(sql_query)
+    assert_same_result(result, query_sqlite(db_path, sql_query))
+
+
+@pytest.mark.parametrize("sql_query", [
+    "SELECT * FROM Crops",
+    "SELECT crop_name, SUM(yield_amount) FROM Crops GROUP BY crop_name ORDER BY 2 DESC",
+    "SELECT MAX(yield_amount) FROM Crops",
+    "SELECT SUM(yield_amount) FROM Crops WHERE yield_amount > 50",
+    "SELECT SUM(yield_amount) FROM Harvests",
+])
+def test_unsupported_queries_fall_back(db_path, sql_query):
+    assert ColumnarSnapshot(db_path).query_sql(sql_query) is None
+
+
+def test_concurrent_first_use_builds_one_snapshot(db_path):
+    snapshot = ColumnarSnapshot(db_path)
+    sql_query = "SELECT crop_name, SUM(yield_amount) FROM Crops GROUP BY crop_name"
+    expected = query_sqlite(db_path, sql_query)
+    results, errors = [], []
+    barrier = threading.Barrier(8)
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(snapshot.query_sql(sql_query))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for result in results:
+        assert_same_result(result, expected)
+
+
+def test_snapshot_follows_data_changes(db_path):
+    snapshot = ColumnarSnapshot(db_path)
+    sql_query = "SELECT COUNT(*) FROM Crops"
+    assert_same_result(snapshot.query_sql(sql_query), query_sqlite(db_path, sql_query))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Crops (crop_name, month, year, yield_amount, target) VALUES ('Oats', 'May', 2024, 1, 1)")
+    conn.commit()
+    conn.close()
+    assert_same_result(snapshot.query_sql(sql_query), query_sqlite(db_path, sql_query))
@@ -0,0 +1,31 @@
+# tests/test_data_version.py
+
+import json
+import os
+
+import pytest
+
+from tools.data_version import write_cache_file
+
+
+def test_write_cache_file_replaces_previous_contents(tmp_path):
+    path = str(tmp_path / "farm.db.profile.json")
+    assert write_cache_file(path, {"version": "a", "names": ["Daniel Jeleń"]})
+    assert write_cache_file(path, {"version": "b"})
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"version": "b"}
+    assert os.listdir(tmp_path) == ["farm.db.profile.json"]
+
+
+def test_write_cache_file_keeps_previous_file_on_failure(tmp_path):
+    path = str(tmp_path / "farm.db.entities.json")
+    assert write_cache_file(path, {"version": "a"})
+    with pytest.raises(TypeError):
+        write_cache_file(path, {"version": "b", "entities": object()})
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"version": "a"}
+    assert os.listdir(tmp_path) == ["farm.db.entities.json"]
+
+
+def test_write_cache_file_reports_unwritable_location(tmp_path):
+    assert not write_cache_file(str(tmp_path / "missing" / "farm.db.profile.json"), {"version": "a"})
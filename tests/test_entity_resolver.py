@@ -0,0 +1,81 @@
+# tests/test_entity_resolver.py
+
+import sqlite3
+
+import pytest
+
+from tools.entity_resolver import EntityResolver
+
+CROPS = ["Wheat", "Tomato", "Tomato (Greenhouse)", "Cucumber (Greenhouse)", "Potatoes"]
+EMPLOYEES = ["Anna Nowak", "Anna Kowalska", "Daniel Jeleń", "Jan Jerzmanowski", "Łukasz Wiśniewski"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "farm.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Crops (id INTEGER PRIMARY KEY, crop_name TEXT, month TEXT, year INTEGER, yield_amount REAL, target REAL)")
+    conn.execute("CREATE TABLE Wages (id INTEGER PRIMARY KEY, employee_name TEXT, wage REAL, month TEXT, year INTEGER, time_worked REAL)")
+    conn.executemany("INSERT INTO Crops (crop_name, month, year, yield_amount, target) VALUES (?, 'May', 2023, 1, 1)", [(crop,) for crop in CROPS])
+    conn.executemany("INSERT INTO Wages (employee_name, wage, month, year, time_worked) VALUES (?, 1, 'May', 2023, 1)", [(name,) for name in EMPLOYEES])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize("mention, expected", [
+    ("tomato", "Tomato"),
+    ("greenhouse tomatoes", "Tomato (Greenhouse)"),
+    ("Greenhouse Tomato", "Tomato (Greenhouse)"),
+    ("potato", "Potatoes"),
+    ("Daniel Jelen", "Daniel Jeleń"),
+    ("lukasz wisniewski", "Łukasz Wiśniewski"),
+    ("Jerzmanowski", "Jan Jerzmanowski"),
+    ("Jerzmanowsky", "Jan Jerzmanowski"),
+    ("Wiśniewsky Łukasz", "Łukasz Wiśniewski"),
+])
+def test_resolve(db_path, mention, expected):
+    matches = EntityResolver(db_path).resolve(mention)
+    assert matches and matches[0].value == expected
+
+
+def test_resolve_exact_match_has_full_score(db_path):
+    matches = EntityResolver(db_path).resolve("nowak anna")
+    assert [(match.value, match.score) for match in matches] == [("Anna Nowak", 1.0)]
+
+
+def test_resolve_restricts_column(db_path):
+    resolver = EntityResolver(db_path)
+    assert resolver.resolve("wheat", column="employee_name") == []
+    assert resolver.resolve("wheat", column="crop_name")[0].value == "Wheat"
+
+
+def test_find_mentions(db_path):
+    mentions = EntityResolver(db_path).find_mentions("Total yield of greenhouse tomatoes and wages of Daniel Jelen in 2023")
+    assert {mention: [match.value for match in matches] for mention, matches in mentions.items()} == {
+        "greenhouse tomatoes": ["Tomato (Greenhouse)"],
+        "Daniel Jelen": ["Daniel Jeleń"],
+    }
+
+
+def test_find_mentions_lists_all_equally_good_matches(db_path):
+    mentions = EntityResolver(db_path).find_mentions("Wages of Anna and yield of the greenhouse crops")
+    assert sorted(match.value for match in mentions["Anna"]) == ["Anna Kowalska", "Anna Nowak"]
+    assert sorted(match.value for match in mentions["greenhouse"]) == ["Cucumber (Greenhouse)", "Tomato (Greenhouse)"]
+
+
+def test_find_mentions_leaves_out_too_ambiguous_mentions(db_path):
+    assert EntityResolver(db_path).find_mentions("Wages of Anna", max_candidates=1) == {}
+
+
+def test_index_follows_data_changes(db_path):
+    resolver = EntityResolver(db_path)
+    assert resolver.resolve("Zofia Mazur") == []
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Wages (employee_name, wage, month, year, time_worked) VALUES ('Zofia Mazur', 1, 'May', 2023, 1)")
+    conn.commit()
+    conn.close()
+    assert resolver.resolve("Zofia Mazur")[0].value == "Zofia Mazur"
+    # A new resolver loads the stored values of the current data version
+    assert EntityResolver(db_path).resolve("mazur")[0].value == "Zofia Mazur"
@@ -0,0 +1,48 @@
+# tests/test_formatting.py
+
+import sqlite3
+
+import pandas as pd
+
+from langchain_workflows.formatting import _parse_to_markdown_table, render_markdown_table
+
+
+def test_render_markdown_table_renders_nulls_as_empty_cells():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Wages (wage REAL, year INTEGER)")
+    df = pd.read_sql_query("SELECT SUM(wage) AS total, NULL AS note FROM Wages WHERE year = 1999", conn)
+    assert render_markdown_table(df) == "| total | note |\n|---|---|\n|  |  |"
+
+
+def test_render_markdown_table_handles_duplicate_column_names():
+    df = pd.DataFrame([["May", "June", 1.5]], columns=["month", "month", "wage"])
+    assert render_markdown_table(df) == "| month | month | wage |\n|---|---|---|\n| May | June | 1.5 |"
+
+
+def test_render_markdown_table_escapes_cells():
+    df = pd.DataFrame({"crop_name": ["Tomato | Greenhouse", "Wheat\nwinter"]})
+    assert render_markdown_table(df).splitlines()[2:] == ["| Tomato \\| Greenhouse |", "| Wheat winter |"]
+
+
+def test_render_markdown_table_paginates():
+    df = pd.DataFrame({"year": range(2000, 2012)})
+    table = render_markdown_table(df, max_rows=5, page=1)
+    assert table.splitlines()[2:7] == [f"| {year} |" for year in range(2005, 2010)]
+    assert table.endswith("_Rows 6 - 10 of 12_")
+    assert "_Rows" not in render_markdown_table(df)
+
+
+def test_parse_to_markdown_table_pads_rows_and_keeps_integers():
+    table = _parse_to_markdown_table("[('Wheat', 3, None), ('Potato',)]")
+    assert table == "| Column 1 | Column 2 | Column 3 |\n|---|---|---|\n| Wheat | 3 |  |\n| Potato |  |  |"
+
+
+def test_parse_to_markdown_table_notes_rows_beyond_the_page():
+    table = _parse_to_markdown_table(str([(year,) for year in range(2000, 2012)]), max_rows=5)
+    assert table.endswith("_Rows 1 - 5 of 12_")
+
+
+def test_parse_to_markdown_table_passes_through_other_observations():
+    assert _parse_to_markdown_table("no such table: Harvests") == "no such table: Harvests"
+    assert _parse_to_markdown_table("[]") == "Empty data"
+    assert _parse_to_markdown_table("42") == "42"
@@ -0,0 +1,37 @@
+# tests/test_prompt_assembly.py
+
+from langchain_core.agents import AgentAction
+
+from langchain_workflows.prompt_assembly import compact_observation, format_compact_scratchpad
+
+
+def _steps(count, rows=200):
+    table = "\n".join(f"| Wheat | {year} | {i} |" for i, year in enumerate(range(rows)))
+    return [
+        (AgentAction("execute_sql_query", f"SELECT {i}", f"Thought: step {i}\nAction: execute_sql_query\nAction Input: SELECT {i}"), table)
+        for i in range(count)
+    ]
+
+
+def test_compact_observation_notes_omitted_lines():
+    text = compact_observation("\n".join(map(str, range(100))), max_lines=3)
+    assert text == "0\n1\n2\n... (97 more lines omitted)"
+
+
+def test_scratchpad_extends_previous_iteration():
+    steps = _steps(3, rows=5)
+    for i in range(1, len(steps)):
+        assert format_compact_scratchpad(steps[:i + 1]).startswith(format_compact_scratchpad(steps[:i]))
+
+
+def test_scratchpad_keeps_reduced_steps_reduced():
+    steps = _steps(6)
+    previous = None
+    for i in range(1, len(steps) + 1):
+        scratchpad = format_compact_scratchpad(steps[:i], max_chars=4000)
+        assert len(scratchpad) <= 4000 or i == 1
+        reduced = scratchpad.count("(shortened,")
+        if previous is not None:
+            assert reduced >= previous
+        previous = reduced
+    assert previous > 0
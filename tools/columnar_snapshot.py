@@ -0,0 +1,365 @@
+# tools/columnar_snapshot.py
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_version import get_data_version
+
+# Columns stored per table. Text columns are dictionary-encoded into int32 codes.
+TABLE_COLUMNS = {
+    "Crops": {
+        "crop_name": "category",
+        "month": "category",
+        "year": "int16",
+        "yield_amount": "float64",
+        "target": "float64",
+    },
+    "Wages": {
+        "employee_name": "category",
+        "month": "category",
+        "year": "int16",
+        "wage": "float64",
+        "time_worked": "float64",
+    },
+}
+AGGREGATES = ("sum", "mean", "count")
+BUILD_CHUNK_SIZE = 500_000
+
+FilterValue = Union[str, int, Sequence[Union[str, int]]]
+
+
+class ColumnarSnapshot:
+    """
+    A read-only columnar copy of the Crops and Wages tables for fast aggregates.
+
+    Every column is stored as a `.npy` file next to the database and opened memory-mapped,
+    so several processes reading the same snapshot share the page cache. The snapshot is
+    rebuilt automatically when the data version of the database changes.
+    """
+
+    def __init__(self, db_path: str, snapshot_dir: Optional[str] = None):
+        """
+        Initializes the snapshot for the given database. Nothing is built until the first query.
+
+        Args:
+            db_path (str): Path to the SQLite database.
+            snapshot_dir (str): Directory for the snapshot files. Defaults to `<db_path>.columnar`.
+        """
+        self.db_path = db_path
+        self.snapshot_dir = snapshot_dir or f"{db_path}.columnar"
+        # The loaded snapshot, replaced as a whole so a running query keeps a consistent view
+        self._state = None
+        # Threads of the batch runner share one snapshot, only one of them builds or loads it
+        self._lock = threading.Lock()
+
+    def refresh(self) -> dict:
+        """
+        Makes sure the loaded snapshot matches the current data version, building it if needed.
+
+        Returns:
+            dict: The loaded snapshot: version, columns, dictionaries and years per table.
+        """
+        version = get_data_version(self.db_path)
+        with self._lock:
+            if self._state is not None and self._state["version"] == version:
+                return self._state
+
+            version_dir = os.path.join(self.snapshot_dir, version)
+            if not os.path.exists(os.path.join(version_dir, "meta.json")):
+                self._build(version, version_dir)
+            self._state = self._load(version, version_dir)
+            self._remove_stale_versions(version)
+            return self._state
+
+    def _build(self, version: str, version_dir: str) -> None:
+        # Build into a private directory and rename it, so readers never see a half-written snapshot
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f"{version}.tmp-", dir=self.snapshot_dir)
+        meta = {"version": version, "tables": {}}
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table, columns in TABLE_COLUMNS.items():
+                rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                arrays = {
+                    name: np.lib.format.open_memmap(
+                        os.path.join(tmp_dir, f"{table}.{name}.npy"),
+                        mode="w+",
+                        dtype="int32" if dtype == "category" else dtype,
+                        shape=(rows,),
+                    )
+                    for name, dtype in columns.items()
+                }
+                dictionaries = {name: {} for name, dtype in columns.items() if dtype == "category"}
+
+                offset = 0
+                query = f"SELECT {', '.join(columns)} FROM {table} ORDER BY id"
+                for chunk in pd.read_sql_query(query, conn, chunksize=BUILD_CHUNK_SIZE):
+                    end = offset + len(chunk)
+                    for name in columns:
+                        if name in dictionaries:
+                            codes, uniques = pd.factorize(chunk[name])
+                            lookup = dictionaries[name]
+                            mapping = np.array([lookup.setdefault(value, len(lookup)) for value in uniques], dtype="int32")
+                            arrays[name][offset:end] = mapping[codes]
+                        else:
+                            arrays[name][offset:end] = chunk[name].to_numpy()
+                    offset = end
+
+                for array in arrays.values():
+                    array.flush()
+                meta["tables"][table] = {
+                    "rows": rows,
+                    "dictionaries": {name: list(lookup) for name, lookup in dictionaries.items()},
+                }
+        finally:
+            conn.close()
+
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Another process has published the same version in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _load(version: str, version_dir: str) -> dict:
+        with open(os.path.join(version_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        state = {"version": version, "columns": {}, "dictionaries": {}, "years": {}}
+        for table, columns in TABLE_COLUMNS.items():
+            state["columns"][table] = {
+                name: np.load(os.path.join(version_dir, f"{table}.{name}.npy"), mmap_mode="r")
+                for name in columns
+            }
+            state["dictionaries"][table] = meta["tables"][table]["dictionaries"]
+            years = state["columns"][table]["year"]
+            state["years"][table] = list(range(int(years.min()), int(years.max()) + 1)) if len(years) else []
+        return state
+
+    def _remove_stale_versions(self, current_version: str) -> None:
+        for entry in os.listdir(self.snapshot_dir):
+            if entry != current_version and ".tmp-" not in entry:
+                shutil.rmtree(os.path.join(self.snapshot_dir, entry), ignore_errors=True)
+
+    @staticmethod
+    def _group_codes(state: dict, table: str, column: str, rows: Optional[np.ndarray]):
+        """Returns integer group codes of the selected rows of a column and the labels of those codes."""
+        values = state["columns"][table][column]
+        if rows is not None:
+            values = values[rows]
+        if column in state["dictionaries"][table]:
+            return values, state["dictionaries"][table][column]
+        # Years are dense, so they are grouped by their offset from the first year
+        labels = state["years"][table]
+        return values - (labels[0] if labels else 0), labels
+
+    @staticmethod
+    def _filter_mask(state: dict, table: str, filters: Dict[str, FilterValue]) -> Optional[np.ndarray]:
+        mask = None
+        for column, wanted in filters.items():
+            if column not in TABLE_COLUMNS[table]:
+                raise ValueError(f"Unknown column {column} in table {table}.")
+            wanted = list(wanted) if isinstance(wanted, (list, tuple, set)) else [wanted]
+            values = state["columns"][table][column]
+            if column in state["dictionaries"][table]:
+                lookup = {value: code for code, value in enumerate(state["dictionaries"][table][column])}
+                wanted = [lookup[value] for value in wanted if value in lookup]
+            elif np.issubdtype(values.dtype, np.integer):
+                # Values outside of the column type can never match, and would overflow the comparison
+                limits = np.iinfo(values.dtype)
+                wanted = [value for value in wanted if isinstance(value, int) and limits.min <= value <= limits.max]
+            if len(wanted) <= 8:
+                # A few equality scans are much faster than np.isin, which sorts its inputs
+                condition = np.zeros(len(values), dtype=bool)
+                for value in wanted:
+                    condition |= values == value
+            else:
+                condition = np.isin(values, np.array(wanted, dtype=values.dtype))
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def aggregate(
+        self,
+        table: str,
+        aggregates: Dict[str, tuple],
+        group_by: Sequence[str] = (),
+        filters: Optional[Dict[str, FilterValue]] = None,
+    ) -> pd.DataFrame:
+        """
+        Computes a filtered group-by aggregate over the snapshot.
+
+        Args:
+            table (str): "Crops" or "Wages".
+            aggregates (Dict[str, tuple]): Output column name mapped to (function, column), e.g.
+                {"total_yield": ("sum", "yield_amount")}. Function is one of sum, mean, count;
+                the column of count may be "*".
+            group_by (Sequence[str]): Text or year columns to group by.
+            filters (Dict[str, FilterValue]): Column mapped to a value or a list of accepted values.
+
+        Returns:
+            pd.DataFrame: One row per non-empty group, ordered by the group columns. Like SQL, SUM and AVG
+                over no rows are None.
+        """
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table {table}.")
+        state = self.refresh()
+        columns = state["columns"][table]
+        group_by = list(group_by)
+
+        mask = self._filter_mask(state, table, filters or {})
+
+        rows = np.flatnonzero(mask) if mask is not None else None
+
+        # Combine all group columns into a single dense group index over the selected rows only
+        group_index = np.zeros(len(columns["year"]) if rows is None else len(rows), dtype="intp")
+        labels = []
+        for column in group_by:
+            if column not in TABLE_COLUMNS[table] or TABLE_COLUMNS[table][column] == "float64":
+                raise ValueError(f"Cannot group by column {column}.")
+            codes, column_labels = self._group_codes(state, table, column, rows)
+            group_index *= max(len(column_labels), 1)
+            group_index += codes
+            labels.append(column_labels)
+        group_count = int(np.prod([max(len(column_labels), 1) for column_labels in labels])) if labels else 1
+
+        counts = np.bincount(group_index, minlength=group_count)
+        # Like SQL, an aggregate without GROUP BY returns a single row even when nothing matches
+        non_empty = np.nonzero(counts)[0] if labels else np.array([0])
+
+        result = {}
+        if labels:
+            for column, coordinates in zip(group_by, np.unravel_index(non_empty, [len(column_labels) for column_labels in labels])):
+                column_labels = labels[group_by.index(column)]
+                result[column] = [column_labels[i] for i in coordinates]
+
+        for name, (function, column) in aggregates.items():
+            if function not in AGGREGATES:
+                raise ValueError(f"Unsupported aggregate {function}.")
+            if function == "count":
+                result[name] = counts[non_empty]
+                continue
+            values = columns[column] if rows is None else columns[column][rows]
+            sums = np.bincount(group_index, weights=values, minlength=group_count)[non_empty]
+            if function == "mean":
+                with np.errstate(invalid="ignore"):
+                    sums = sums / counts[non_empty]
+            if (counts[non_empty] == 0).any():
+                # Only an aggregate without GROUP BY can be empty, SQLite answers NULL there
+                sums = [None if count == 0 else value for value, count in zip(sums, counts[non_empty])]
+            result[name] = sums
+
+        frame = pd.DataFrame(result)
+        if group_by:
+            frame = frame.sort_values(group_by, kind="stable").reset_index(drop=True)
+        return frame
+
+    def query_sql(self, sql_query: str) -> Optional[pd.DataFrame]:
+        """
+        Answers a simple aggregate SQL query from the snapshot.
+
+        Supported are queries of the form
+        `SELECT [group columns,] SUM|AVG|COUNT(column) [AS alias], ... FROM table
+        [WHERE column = value AND column IN (values) ...] [GROUP BY group columns]`.
+
+        Args:
+            sql_query (str): The SQL query.
+
+        Returns:
+            pd.DataFrame or None: The result, or None if the query is not supported and has to go to SQLite.
+        """
+        parsed = _parse_aggregate_query(sql_query)
+        if parsed is None:
+            return None
+        return self.aggregate(**parsed)
+
+
+_QUERY_PATTERN = re.compile(
+    r"^\s*select\s+(?P<select>.+?)\s+from\s+(?P<table>\w+)"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+group\s+by\s+(?P<group>.+?))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_AGGREGATE_PATTERN = re.compile(
+    r"^(?P<function>sum|avg|count)\s*\(\s*(?P<column>\w+|\*)\s*\)(?:\s+as\s+(?P<alias>\w+))?$",
+    re.IGNORECASE,
+)
+_CONDITION_PATTERN = re.compile(
+    r"^(?P<column>\w+)\s*(?:=\s*(?P<value>'[^']*'|-?\d+)|in\s*\((?P<values>[^)]*)\))$",
+    re.IGNORECASE,
+)
+_VALUE_PATTERN = re.compile(r"'([^']*)'|(-?\d+)")
+
+
+def _parse_value(text: str) -> Optional[Union[str, int]]:
+    match = _VALUE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        return None
+    return match.group(1) if match.group(1) is not None else int(match.group(2))
+
+
+def _parse_aggregate_query(sql_query: str) -> Optional[dict]:
+    """Parses a simple aggregate query into `ColumnarSnapshot.aggregate` arguments, or returns None."""
+    match = _QUERY_PATTERN.match(sql_query)
+    if match is None:
+        return None
+
+    table = next((name for name in TABLE_COLUMNS if name.lower() == match.group("table").lower()), None)
+    if table is None:
+        return None
+    columns = TABLE_COLUMNS[table]
+
+    group_by = []
+    if match.group("group"):
+        group_by = [column.strip() for column in match.group("group").split(",")]
+        if any(column not in columns or columns[column] == "float64" for column in group_by):
+            return None
+
+    aggregates = {}
+    selected_groups = []
+    for item in (part.strip() for part in match.group("select").split(",")):
+        aggregate = _AGGREGATE_PATTERN.match(item)
+        if aggregate is None:
+            if item not in group_by:
+                return None
+            selected_groups.append(item)
+            continue
+        function = {"avg": "mean"}.get(aggregate.group("function").lower(), aggregate.group("function").lower())
+        column = aggregate.group("column")
+        if column == "*" and function != "count":
+            return None
+        if column != "*" and column not in columns:
+            return None
+        if function != "count" and columns[column] != "float64":
+            return None
+        aggregates[aggregate.group("alias") or item] = (function, column)
+
+    # Every group column must be selected, in the order of the GROUP BY clause
+    if not aggregates or selected_groups != group_by:
+        return None
+
+    filters = {}
+    if match.group("where"):
+        for condition in re.split(r"\s+and\s+", match.group("where"), flags=re.IGNORECASE):
+            parsed = _CONDITION_PATTERN.match(condition.strip())
+            if parsed is None or parsed.group("column") not in columns or parsed.group("column") in filters:
+                return None
+            texts = [parsed.group("value")] if parsed.group("value") is not None else parsed.group("values").split(",")
+            values = [_parse_value(text) for text in texts]
+            expected_type = str if columns[parsed.group("column")] == "category" else int
+            if any(not isinstance(value, expected_type) for value in values):
+                return None
+            filters[parsed.group("column")] = values
+
+    return {"table": table, "aggregates": aggregates, "group_by": group_by, "filters": filters}
@@ -0,0 +1,61 @@
+# tools/data_version.py
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def get_data_version(db_path: str) -> str:
+    """
+    Returns a cheap fingerprint of the SQLite database contents.
+
+    The fingerprint is built from the size and modification time of the database file and its
+    write-ahead log, so it changes on every committed write without reading any table.
+    Caches derived from the database (snapshots, profiles, indexes) store it to know when to rebuild.
+
+    Args:
+        db_path (str): Path to the SQLite database.
+
+    Returns:
+        str: Short hexadecimal data version.
+    """
+    parts = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        except FileNotFoundError:
+            parts.append("-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def write_cache_file(path: str, data: Any) -> bool:
+    """
+    Stores a cache derived from the database as JSON, replacing the previous file atomically.
+
+    The data is written to a temporary file next to `path` and renamed over it, so processes sharing
+    the cache, e.g. the Streamlit app and the batch runner, never read a half-written file.
+
+    Args:
+        path (str): Path of the cache file.
+        data (Any): JSON-serializable cache contents.
+
+    Returns:
+        bool: Whether the cache was stored. A read-only location is not an error, the cache is rebuilt next time.
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,377 @@
+# tools/entity_resolver.py
+
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .data_version import get_data_version, write_cache_file
+
+# Columns whose distinct values are indexed, as (table, column)
+ENTITY_COLUMNS = [("Crops", "crop_name"), ("Wages", "employee_name")]
+
+# Letters that Unicode normalization does not decompose into a base letter and an accent
+_EXTRA_FOLDING = str.maketrans({"ł": "l", "Ł": "L", "ß": "ss", "ø": "o", "Ø": "O"})
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+# Words that never start or end a mention, English and Polish
+_STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or", "per", "the", "to", "vs", "with",
+    "dla", "do", "i", "na", "od", "oraz", "po", "w", "z", "za",
+}
+# Misspelled mentions similar to more values are too ambiguous to resolve, and too slow to rank
+FUZZY_MAX_CANDIDATES = 2000
+
+
+class EntityMatch(NamedTuple):
+    value: str
+    table: str
+    column: str
+    score: float
+
+
+class _Index(NamedTuple):
+    entities: List[Tuple[str, str, str]]
+    # Number of trigrams of every entity
+    gram_counts: "array[int]"
+    # Token -> entities containing it, and the single-token entities, e.g. "Wheat"
+    tokens: Dict[str, Set[int]]
+    single: Dict[str, List[int]]
+    # Trigrams of every distinct token and trigram -> tokens containing it. Values are made of far
+    # fewer distinct tokens (first names, surnames, ...) than there are values.
+    token_grams: Dict[str, Set[str]]
+    gram_tokens: Dict[str, List[str]]
+
+
+_EMPTY_INDEX = _Index([], array("H"), {}, {}, {}, {})
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes text for matching: lowercase, no diacritics, no punctuation.
+
+    Args:
+        text (str): Text to normalize, e.g. "Daniel Jeleń".
+
+    Returns:
+        str: Normalized text, e.g. "daniel jelen".
+    """
+    text = unicodedata.normalize("NFKD", text.translate(_EXTRA_FOLDING))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+def _stem(token: str) -> str:
+    # English plurals are enough here, names are never inflected in the database
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("oes"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+@lru_cache(maxsize=100_000)
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    return tuple(_stem(token) for token in normalize(word).split())
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    # Values repeat the same few words, so words are normalized once and then looked up
+    return tuple(token for word in text.split() for token in _word_tokens(word))
+
+
+def _trigrams(tokens: Sequence[str]) -> Set[str]:
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class EntityResolver:
+    """
+    Resolves user mentions of crops and employees to the exact values stored in the database.
+
+    Mentions are matched case-, order-, plural- and diacritic-insensitively, e.g. "greenhouse tomatoes"
+    resolves to "Tomato (Greenhouse)" and "Jerzmanowski" to "Jan Jerzmanowski". Values are found through
+    an index of their normalized tokens; misspelled tokens are first matched to similar tokens through
+    their trigrams. The index is built from the distinct database values and rebuilt when the data
+    version changes. The values are stored per data version in
+    `<db_path>.entities.json`, so restarts do not scan the tables again.
+    """
+
+    def __init__(self, db_path: str, min_score: float = 0.6):
+        """
+        Initializes the resolver. The index is built on the first use.
+
+        Args:
+            db_path (str): Path to the SQLite database.
+            min_score (float): Minimum similarity (0 - 1) of a fuzzy match.
+        """
+        self.db_path = db_path
+        self.cache_path = f"{db_path}.entities.json"
+        self.min_score = min_score
+        self._version = None
+        # Replaced as a whole on rebuild, so a running lookup keeps a consistent index
+        self._index = _EMPTY_INDEX
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Rebuilds the index if the data version changed, e.g. after data was ingested.
+
+        Args:
+            force (bool): Rebuild even if the data version did not change.
+        """
+        self._refreshed_index(force)
+
+    def _refreshed_index(self, force: bool = False) -> _Index:
+        version = get_data_version(self.db_path)
+        with self._lock:
+            if version != self._version or force:
+                self._index = self._build(version, force)
+                self._version = version
+            return self._index
+
+    def _build(self, version: str, force: bool) -> _Index:
+        entities = None if force else self._load_entities(version)
+        if entities is None:
+            entities = self._read_entities()
+            write_cache_file(self.cache_path, {"version": version, "entities": entities})
+
+        gram_counts = array("H")
+        tokens_index = defaultdict(set)
+        single = defaultdict(list)
+        token_grams = {}
+        for entity_id, (value, _, _) in enumerate(entities):
+            tokens = _tokens(value)
+            for token in tokens:
+                tokens_index[token].add(entity_id)
+                if token not in token_grams:
+                    token_grams[token] = _trigrams([token])
+            if len(tokens) == 1:
+                single[tokens[0]].append(entity_id)
+                gram_counts.append(len(token_grams[tokens[0]]))
+            else:
+                gram_counts.append(len(set().union(*(token_grams[token] for token in tokens))))
+
+        gram_tokens = defaultdict(list)
+        for token, grams in token_grams.items():
+            for gram in grams:
+                gram_tokens[gram].append(token)
+        return _Index(entities, gram_counts, dict(tokens_index), dict(single), token_grams, dict(gram_tokens))
+
+    def _load_entities(self, version: str) -> Optional[List[Tuple[str, str, str]]]:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("version") != version:
+            return None
+        return [tuple(entity) for entity in cached["entities"]]
+
+    def _read_entities(self) -> List[Tuple[str, str, str]]:
+        entities = []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table, column in ENTITY_COLUMNS:
+                for (value,) in conn.execute(f'SELECT DISTINCT "{column}" FROM "{table}" WHERE "{column}" IS NOT NULL'):
+                    entities.append((value, table, column))
+        finally:
+            conn.close()
+        return entities
+
+    def resolve(self, mention: str, column: Optional[str] = None, limit: int = 3) -> List[EntityMatch]:
+        """
+        Returns the database values that best match a mention.
+
+        Args:
+            mention (str): The text typed by the user, e.g. "cucumbers".
+            column (str): Restricts matches to one column, "crop_name" or "employee_name".
+            limit (int): Maximum number of matches.
+
+        Returns:
+            List[EntityMatch]: Matches ordered by score, best first. Exact matches have score 1.0.
+        """
+        candidates = self._candidates(self._refreshed_index(), _tokens(mention), column, self.min_score, limit=limit)
+        return [match for match, _ in candidates if match.score >= self.min_score][:limit]
+
+    def _candidates(
+        self,
+        index: _Index,
+        tokens: Sequence[str],
+        column: Optional[str],
+        min_containment: float,
+        max_ties: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[List[Tuple[EntityMatch, int]]]:
+        """
+        Returns the best matches of a mention, best first, with the number of mention trigrams each one contains.
+
+        Only values containing at least `min_containment` of the mention trigrams are considered, any
+        match scoring `min_containment` or more is among them. Returns None when more than `max_ties`
+        values contain all tokens of the mention, they are equally good matches and are not ranked.
+        """
+        if not tokens:
+            return []
+        grams = _trigrams(tokens)
+        entities = index.entities
+
+        # Values containing every token of the mention contain all of its trigrams, e.g. "Anna"
+        token_sets = [index.tokens.get(token) for token in set(tokens)]
+        if all(token_sets):
+            matched = token_sets[0] if len(token_sets) == 1 else set.intersection(*sorted(token_sets, key=len))
+            matched = self._in_column(index, matched, column)
+            # Values made of exactly the tokens of the mention, in any order. They contain no other trigrams.
+            if len(tokens) == 1:
+                exact = [entity_id for entity_id in index.single.get(tokens[0], []) if entity_id in matched]
+            else:
+                gram_counts = index.gram_counts
+                exact = [
+                    entity_id for entity_id in matched
+                    if gram_counts[entity_id] == len(grams) and sorted(_tokens(entities[entity_id][0])) == sorted(tokens)
+                ]
+            if exact:
+                return [(EntityMatch(*entities[entity_id], 1.0), len(grams)) for entity_id in sorted(exact)]
+            if matched:
+                if max_ties is not None and len(matched) > max_ties:
+                    return None
+                return self._rank(index, ((entity_id, len(grams)) for entity_id in matched), len(grams), limit)
+
+        candidates = self._fuzzy_candidates(index, tokens, grams, column, min_containment)
+        if max_ties is not None and candidates:
+            # Only the best match and the values containing as many mention trigrams are needed
+            best = self._rank(index, candidates, len(grams), 1)[0]
+            candidates = [candidate for candidate in candidates if candidate[1] == best[1]]
+            if len(candidates) > max_ties:
+                return None
+        return self._rank(index, candidates, len(grams), limit)
+
+    @staticmethod
+    def _in_column(index: _Index, entity_ids: Set[int], column: Optional[str]) -> Set[int]:
+        if column is None:
+            return entity_ids
+        return {entity_id for entity_id in entity_ids if index.entities[entity_id][2] == column}
+
+    def _fuzzy_candidates(
+        self, index: _Index, tokens: Sequence[str], grams: Set[str], column: Optional[str], min_containment: float
+    ) -> List[Tuple[int, int]]:
+        # Tokens of the mention are matched to similar tokens of the values, e.g. "Jerzmanowsky" to "jerzmanowski",
+        # so candidates are found among the few distinct tokens instead of among all values. A token without
+        # similar tokens is left out as long as the rest can still reach the required containment.
+        required = math.ceil(min_containment * len(grams) - 1e-9)
+        missing = 0
+        matched = None
+        for token in set(tokens):
+            similar = self._similar_tokens(index, token, min_containment)
+            if not similar:
+                missing += len(_trigrams([token]))
+                if len(grams) - missing < required:
+                    return []
+                continue
+            token_ids = set().union(*(index.tokens[similar_token] for similar_token in similar))
+            matched = token_ids if matched is None else matched & token_ids
+            if not matched:
+                return []
+        if matched is None or len(matched) > FUZZY_MAX_CANDIDATES:
+            return []
+
+        # Only the few tokens sharing trigrams with the mention count, so candidates are grouped by those tokens
+        matched = self._in_column(index, matched, column)
+        shared = {token: grams & token_grams for token, token_grams in index.token_grams.items() if grams & token_grams}
+        relevant = defaultdict(list)
+        for token in shared:
+            for entity_id in index.tokens[token] & matched:
+                relevant[entity_id].append(token)
+        commons = {}
+        candidates = []
+        for entity_id, entity_tokens in relevant.items():
+            key = tuple(entity_tokens)
+            if key not in commons:
+                commons[key] = len(set().union(*(shared[token] for token in key)))
+            if commons[key] >= required:
+                candidates.append((entity_id, commons[key]))
+        return candidates
+
+    @staticmethod
+    def _similar_tokens(index: _Index, token: str, min_containment: float) -> List[str]:
+        grams = _trigrams([token])
+        shared = Counter()
+        for gram in grams:
+            shared.update(index.gram_tokens.get(gram, ()))
+        return [similar for similar, common in shared.items() if common >= min_containment * len(grams)]
+
+    @staticmethod
+    def _rank(index: _Index, candidates, gram_count: int, limit: Optional[int] = None) -> List[Tuple[EntityMatch, int]]:
+        scored = []
+        for entity_id, common in candidates:
+            # Containment favours mentions of a part of the value ("Jerzmanowski"), Jaccard breaks the ties
+            containment = common / gram_count
+            jaccard = common / (gram_count + index.gram_counts[entity_id] - common)
+            score = round(0.7 * containment + 0.3 * jaccard, 3)
+            scored.append((-score, index.entities[entity_id][0], entity_id, common))
+        best = heapq.nsmallest(limit, scored) if limit is not None else sorted(scored)
+        return [(EntityMatch(*index.entities[entity_id], -score), common) for score, _, entity_id, common in best]
+
+    def find_mentions(
+        self, text: str, min_score: float = 0.8, max_words: int = 3, max_candidates: int = 5
+    ) -> Dict[str, List[EntityMatch]]:
+        """
+        Finds mentions of crops and employees in free text, e.g. an instruction for the SQL generator.
+
+        Longer word spans are tried first and matched words are not reused. A mention contained
+        equally well in several values is ambiguous, e.g. "Anna" or "greenhouse", and maps to all
+        of them. Mentions with more than `max_candidates` such values are left out.
+
+        Args:
+            text (str): Free text.
+            min_score (float): Minimum similarity of the best match.
+            max_words (int): Maximum number of words in a mention.
+            max_candidates (int): Maximum number of values an ambiguous mention maps to.
+
+        Returns:
+            Dict[str, List[EntityMatch]]: Mention as written in the text mapped to its matches, a single one
+                unless the mention is ambiguous.
+        """
+        index = self._refreshed_index()
+        words = list(_WORD_PATTERN.finditer(text))
+        # Like stopwords, words similar to no token of any value never start or end a mention
+        edges = [
+            word.group().lower() not in _STOPWORDS and all(
+                token in index.tokens or self._similar_tokens(index, token, min_score) for token in _tokens(word.group())
+            )
+            for word in words
+        ]
+        used = [False] * len(words)
+        mentions = {}
+        for size in range(min(max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                if not (edges[start] and edges[start + size - 1]):
+                    continue
+                span = text[words[start].start():words[start + size - 1].end()]
+                if len(span) < 3:
+                    continue
+                # A score is at most the containment, so values containing less than min_score are never needed
+                candidates = self._candidates(index, _tokens(span), None, min_score, max_ties=max_candidates)
+                if candidates is None:
+                    used[start:start + size] = [True] * size
+                    continue
+                if not candidates or candidates[0][0].score < min_score:
+                    continue
+                # The Jaccard part of the score only prefers shorter values, it does not tell which one was meant
+                matches = [match for match, common in candidates if common == candidates[0][1]]
+                if len(matches) <= max_candidates:
+                    mentions[span] = matches
+                used[start:start + size] = [True] * size
+        return mentions
@@ -0,0 +1,176 @@
+# tools/schema_profile.py
+
+import json
+import sqlite3
+import threading
+from typing import List, Optional
+
+from .data_version import get_data_version, write_cache_file
+
+
+class SchemaProfile:
+    """
+    Schema and compact data profile of the SQLite database for the SQL generation prompt.
+
+    The profile lists the columns of every table, the distinct values of low-cardinality columns
+    (crop names, months, years, ...) and min/max of numeric columns. It is introspected once per
+    data version and stored in `<db_path>.profile.json`, so restarts do not scan the tables again.
+    """
+
+    def __init__(self, db_path: str, max_distinct: int = 30, max_chars: int = 2500):
+        """
+        Initializes the profile. Nothing is read from the database until the first use.
+
+        Args:
+            db_path (str): Path to the SQLite database.
+            max_distinct (int): Columns with more distinct values are not listed value by value.
+            max_chars (int): Size budget of the rendered prompt section.
+        """
+        self.db_path = db_path
+        self.cache_path = f"{db_path}.profile.json"
+        self.max_distinct = max_distinct
+        self.max_chars = max_chars
+        self._profile = None
+        self._prompt = None
+        self._lock = threading.Lock()
+
+    def get_profile(self) -> dict:
+        """
+        Returns the profile for the current data version, introspecting the database if needed.
+
+        Returns:
+            dict: {"version": str, "tables": {table: [column profile, ...]}}
+        """
+        version = get_data_version(self.db_path)
+        with self._lock:
+            if self._profile is None or self._profile["version"] != version:
+                self._profile = self._load_or_introspect(version)
+            return self._profile
+
+    def _load_or_introspect(self, version: str) -> dict:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == version and cached.get("max_distinct") == self.max_distinct:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+        profile = self._introspect(version)
+        write_cache_file(self.cache_path, profile)
+        return profile
+
+    def _introspect(self, version: str) -> dict:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            tables = [
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )
+            ]
+            profile = {"version": version, "max_distinct": self.max_distinct, "tables": {}}
+            for table in tables:
+                columns = []
+                for _, name, column_type, _, _, primary_key in conn.execute(f'PRAGMA table_info("{table}")'):
+                    column = {"name": name, "type": column_type.upper()}
+                    if primary_key:
+                        columns.append(column)
+                        continue
+
+                    # DISTINCT with LIMIT stops scanning as soon as the column turns out to be high-cardinality
+                    values = [
+                        row[0] for row in conn.execute(
+                            f'SELECT DISTINCT "{name}" FROM "{table}" WHERE "{name}" IS NOT NULL LIMIT ?',
+                            (self.max_distinct + 1,),
+                        )
+                    ]
+                    if len(values) <= self.max_distinct:
+                        column["values"] = sorted(values)
+                    elif column["type"] == "TEXT":
+                        column["examples"] = sorted(values)[:5]
+                    if column["type"] in ("INTEGER", "REAL"):
+                        column["min"], column["max"] = conn.execute(
+                            f'SELECT MIN("{name}"), MAX("{name}") FROM "{table}"'
+                        ).fetchone()
+                    columns.append(column)
+                profile["tables"][table] = columns
+        finally:
+            conn.close()
+        return profile
+
+    @staticmethod
+    def _render_column(column: dict, with_values: bool) -> str:
+        line = f"{column['name']} ({column['type']})"
+        details = []
+        if with_values and "values" in column:
+            if column["type"] == "TEXT":
+                details.append("values: " + ", ".join(f"'{value}'" for value in column["values"]))
+            else:
+                details.append("values: " + ", ".join(str(value) for value in column["values"]))
+        elif "values" in column:
+            details.append(f"{len(column['values'])} distinct values")
+        elif with_values and "examples" in column:
+            details.append("e.g. " + ", ".join(f"'{value}'" for value in column["examples"]))
+        if "min" in column and not (with_values and "values" in column):
+            details.append(f"range {column['min']} - {column['max']}")
+        return line + (f" [{'; '.join(details)}]" if details else "")
+
+    def _render(self, profile: dict, with_values: List[bool]) -> str:
+        lines = []
+        index = 0
+        for table, columns in profile["tables"].items():
+            lines.append(f"- {table}:")
+            for column in columns:
+                if column["name"] == "id":
+                    index += 1
+                    continue
+                lines.append(f"  - {self._render_column(column, with_values[index])}")
+                index += 1
+        return "\n".join(lines)
+
+    def to_prompt(self) -> str:
+        """
+        Renders the schema and data profile as a prompt section within the size budget.
+
+        Value lists are dropped from the longest ones first until the section fits.
+
+        Returns:
+            str: Prompt section listing tables, columns and their values or ranges.
+        """
+        profile = self.get_profile()
+        if self._prompt is not None and self._prompt[0] == profile["version"]:
+            return self._prompt[1]
+
+        columns = [column for table_columns in profile["tables"].values() for column in table_columns]
+        with_values = [True] * len(columns)
+        text = self._render(profile, with_values)
+
+        by_length = sorted(
+            range(len(columns)),
+            key=lambda i: len(self._render_column(columns[i], True)),
+            reverse=True,
+        )
+        for i in by_length:
+            if len(text) <= self.max_chars:
+                break
+            with_values[i] = False
+            text = self._render(profile, with_values)
+
+        self._prompt = (profile["version"], text[:self.max_chars])
+        return self._prompt[1]
+
+    def get_distinct_values(self, table: str, column: str) -> Optional[List]:
+        """
+        Returns the distinct values of a low-cardinality column, or None for high-cardinality columns.
+
+        Args:
+            table (str): Table name.
+            column (str): Column name.
+
+        Returns:
+            List or None: Sorted distinct values.
+        """
+        for profiled in self.get_profile()["tables"].get(table, []):
+            if profiled["name"] == column:
+                return profiled.get("values")
+        return None